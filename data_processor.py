@@ -1,205 +1,343 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import requests
 from datetime import datetime, timedelta
-import traceback
+import glob
+import hashlib
+import logging
+import os
 import sys
+import uuid
+
+DATA_URL = "https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_confirmed_global.csv"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "covid")
+
+# Bump whenever to_frame() or the processing output changes, so existing
+# cache files for the same upstream CSV are not reused
+CACHE_FORMAT_VERSION = 2
+
+# Non-date columns of the CSV; only Country/Region is used after loading
+ID_COLUMNS = ['Province/State', 'Country/Region', 'Lat', 'Long']
+UNUSED_COLUMNS = ['Province/State', 'Lat', 'Long']
+
+# Shared session so the version check and the download reuse one connection
+HTTP_SESSION = requests.Session()
 
 class CovidDataProcessor:
     def __init__(self):
         self.data = None
-        self.country_data = None
-        self.debug_info = []  # Store debug information
+        self.data_version = None  # Changes whenever different data is loaded
         
-    def log_debug(self, message):
-        """Add debug message and print it"""
-        self.debug_info.append(message)
-        print(f"DEBUG: {message}")
+        # Processed data, stored column-wise as (countries x dates) matrices
+        # sharing one sorted DatetimeIndex
+        self.countries = None
+        self.country_index = {}
+        self.dates = None
+        self.confirmed = None
+        self.daily_new = None
+        self.seven_day_average = None
+        self.log = logging.getLogger(__name__)
         
     def load_data(self):
         """Load COVID-19 data from JHU CSSE GitHub repository"""
         try:
-            self.log_debug("Starting to load data")
-            url = "https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_confirmed_global.csv"
-            
-            # Load the data
-            self.data = pd.read_csv(url)
-            self.log_debug(f"Data loaded successfully. Shape: {self.data.shape}")
-            self.log_debug(f"Columns: {list(self.data.columns[:10])}...")
+            self.log.debug("Starting to load data")
+            
+            # Identify this version of the CSV so callers can key their caches on it.
+            # Without a version header, fall back to a key unique to this load
+            version = self.get_data_version()
+            self.data_version = version or uuid.uuid4().hex
+            
+            # Reuse the processed data if this version of the CSV was seen before
+            cache_path = os.path.join(CACHE_DIR, f"{version}.feather") if version else None
+            if cache_path is not None and os.path.exists(cache_path):
+                try:
+                    self.set_series_from_frame(pd.read_feather(cache_path))
+                    self.log.debug("Processed data loaded from cache: %s", cache_path)
+                    return
+                except Exception as e:
+                    # An unreadable cache file would otherwise break every load, since
+                    # its key does not change; drop it and download the data again
+                    self.log.warning("Ignoring unreadable cache file %s: %s", cache_path, e)
+                    try:
+                        os.remove(cache_path)
+                    except OSError:
+                        pass
+            
+            # Load the data with Arrow's multi-threaded CSV reader, converting to
+            # pandas without keeping a second copy of the table alive. The text
+            # columns are typed explicitly so a block with no Province/State values
+            # cannot be inferred as null. The body is requested compressed and
+            # decompressed while streaming into the parser
+            with HTTP_SESSION.get(DATA_URL, headers={"Accept-Encoding": "gzip"}, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                table = pacsv.read_csv(
+                    response.raw,
+                    read_options=pacsv.ReadOptions(use_threads=True, block_size=1 << 20),
+                    convert_options=pacsv.ConvertOptions(
+                        column_types={'Province/State': pa.string(), 'Country/Region': pa.string()}
+                    )
+                )
+            
+            # Drop the columns nothing downstream uses before converting to pandas
+            table = table.drop_columns(UNUSED_COLUMNS)
+            self.data = table.to_pandas(split_blocks=True, self_destruct=True)
+            self.log.debug("Data loaded successfully. Shape: %s", self.data.shape)
             
             # Process the data right away
-            processed_data = self.process_data()
-            self.log_debug("Data processed successfully")
+            self.process_data()
+            self.log.debug("Data processed successfully")
             
-            return processed_data
+            if cache_path is not None:
+                self.save_cache(cache_path)
             
         except Exception as e:
-            error_info = traceback.format_exc()
-            self.log_debug(f"Error loading data: {str(e)}\n{error_info}")
+            self.log.exception("Error loading data: %s", e)
             raise Exception(f"Error loading data: {str(e)}")
             
+    def get_data_version(self):
+        """Return a key for the current version of the CSV, or None if unknown"""
+        try:
+            response = HTTP_SESSION.head(DATA_URL, timeout=10)
+            response.raise_for_status()
+            version = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        except Exception as e:
+            self.log.warning("Could not check data version: %s", e)
+            return None
+            
+        if not version:
+            self.log.debug("No ETag or Last-Modified header, skipping cache")
+            return None
+            
+        return hashlib.sha256(f"{CACHE_FORMAT_VERSION}:{version}".encode()).hexdigest()[:16]
+        
+    def save_cache(self, cache_path):
+        """Write the processed data to the on-disk cache"""
+        # Write to a temporary file first so concurrent readers never see a partial file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            self.to_frame().to_feather(tmp_path, compression="zstd")
+            os.replace(tmp_path, cache_path)
+            self.log.debug("Processed data cached to %s", cache_path)
+            
+            # Remove files left behind by older data or cache format versions
+            for old_path in glob.glob(os.path.join(os.path.dirname(cache_path), "*.feather")):
+                if old_path != cache_path:
+                    os.remove(old_path)
+                    self.log.debug("Removed stale cache file %s", old_path)
+            
+        except Exception as e:
+            # A failed cache write should never break loading
+            self.log.warning("Error writing cache: %s", e)
+            
+        finally:
+            # Only left behind if the write or the rename failed
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError as e:
+                    self.log.warning("Could not remove temporary cache file %s: %s", tmp_path, e)
+            
     def process_data(self):
         """Process and transform the raw data"""
         try:
             if self.data is None:
-                self.log_debug("No data to process")
+                self.log.debug("No data to process")
                 raise ValueError("No data to process. Please load data first.")
                 
-            self.log_debug("Starting data processing")
-            
-            # Create a copy of the data
-            df = self.data.copy()
-            self.log_debug(f"Original data columns: {list(df.columns[:10])}...")
-            
-            # Identify date columns (all columns after the 4th column)
-            date_columns = df.columns[4:]
-            self.log_debug(f"Identified {len(date_columns)} date columns")
-            
-            # Melt the dataframe to convert dates from columns to rows
-            self.log_debug("Melting dataframe...")
-            melted_df = df.melt(
-                id_vars=['Province/State', 'Country/Region', 'Lat', 'Long'],
-                value_vars=date_columns,
-                var_name='Date', 
-                value_name='Confirmed'
-            )
-            self.log_debug(f"Melted dataframe shape: {melted_df.shape}")
-            self.log_debug(f"Melted dataframe columns: {list(melted_df.columns)}")
-            
-            # Verify Date column exists after melting
-            if 'Date' not in melted_df.columns:
-                self.log_debug("Date column missing after melting!")
-                raise ValueError("Date column is missing after melting operation")
-                
-            # Convert date strings to datetime objects
-            self.log_debug("Converting dates to datetime objects")
-            melted_df['Date'] = pd.to_datetime(melted_df['Date'], errors='coerce')
-            
-            # Check for NaT values after conversion
-            nat_count = melted_df['Date'].isna().sum()
-            self.log_debug(f"NaT values after date conversion: {nat_count}")
-            
-            if nat_count > 0:
-                # If there are NaT values, try an alternative parsing approach
-                self.log_debug("Trying alternative date parsing")
-                melted_df['Date'] = pd.to_datetime(melted_df['Date'], format='%m/%d/%y', errors='coerce')
-                nat_count = melted_df['Date'].isna().sum()
-                self.log_debug(f"NaT values after alternative date parsing: {nat_count}")
-            
-            # Group by country and date, summing the confirmed cases
-            self.log_debug("Grouping by country and date")
-            country_data = melted_df.groupby(['Country/Region', 'Date'])['Confirmed'].sum().reset_index()
-            self.log_debug(f"Country data shape after grouping: {country_data.shape}")
-            self.log_debug(f"Country data columns: {list(country_data.columns)}")
-            
-            # Verify Date column exists after grouping
-            if 'Date' not in country_data.columns:
-                self.log_debug("Date column missing after grouping!")
-                raise ValueError("Date column is missing after grouping operation")
-            
-            # Calculate daily new cases
-            self.log_debug("Calculating daily new cases")
-            country_data['Daily_New'] = country_data.groupby('Country/Region')['Confirmed'].diff().fillna(0)
-            
-            # Replace negative values with 0
-            country_data['Daily_New'] = country_data['Daily_New'].clip(lower=0)
-            
-            # Calculate 7-day moving average
-            self.log_debug("Calculating 7-day moving average")
-            country_data['Seven_Day_Average'] = country_data.groupby('Country/Region')['Daily_New']\
-                .rolling(window=7, min_periods=1).mean().reset_index(0, drop=True)
-            
-            # Final check for Date column
-            if 'Date' not in country_data.columns:
-                self.log_debug("Date column missing in final data!")
-                raise ValueError("Date column is missing from the final processed data")
-                
-            # Store processed data
-            self.country_data = country_data.copy()
-            self.log_debug(f"Final country data shape: {self.country_data.shape}")
-            self.log_debug(f"Final country data columns: {list(self.country_data.columns)}")
+            self.log.debug("Starting data processing")
+            
+            # Only read from the raw data, so no defensive copy is needed
+            df = self.data
+            
+            # Identify date columns (everything except the ID columns still present)
+            date_columns = df.columns.drop(ID_COLUMNS, errors='ignore')
+            self.log.debug("Identified %s date columns", len(date_columns))
+            
+            # Parse the date headers once instead of once per row
+            self.log.debug("Converting dates to datetime objects")
+            dates = pd.to_datetime(date_columns, format='%m/%d/%y')
+            
+            # The daily diff, the running sum and the date slicing in filter_data all
+            # rely on dates increasing along each row, so put the columns in date order
+            if not dates.is_monotonic_increasing:
+                self.log.debug("Date columns are out of order, sorting them")
+                date_order = np.argsort(dates, kind='stable')
+                dates = dates[date_order]
+                date_columns = date_columns[date_order]
+            
+            # Sum the regions of each country in wide form. After a stable sort each
+            # country's rows are contiguous, so reduceat adds them up block by block.
+            # Only the country keys are sorted; the value rows are gathered once in
+            # that order instead of sorting a copy of the whole frame.
+            # Blank cells count as 0 cases, as they did in a groupby sum
+            self.log.debug("Aggregating regions by country")
+            country_keys = df['Country/Region'].to_numpy()
+            order = np.argsort(country_keys, kind='stable')
+            countries, starts = np.unique(country_keys[order], return_index=True)
+            values = df[date_columns].fillna(0).to_numpy(dtype=np.int64)[order]
+            summed = np.add.reduceat(values, starts, axis=0)
+            n_countries, n_dates = summed.shape
+            
+            # Case counts normally fit in int32, which halves the memory held by the
+            # matrices and the traffic of every later pass. Keep int64 if they do not
+            int32_range = np.iinfo(np.int32)
+            if summed.size and int32_range.min <= summed.min() and summed.max() <= int32_range.max:
+                summed = summed.astype(np.int32)
+            else:
+                self.log.warning("Case counts exceed the int32 range, keeping int64")
+            self.log.debug("Country matrix shape: %s", summed.shape)
+            
+            # Calculate daily new cases along each country's row, replacing
+            # negative values (data corrections) with 0. The first day has no
+            # previous value and stays 0. Written in place into one preallocated
+            # matrix rather than through diff/clip copies
+            self.log.debug("Calculating daily new cases")
+            daily = np.zeros_like(summed)
+            np.subtract(summed[:, 1:], summed[:, :-1], out=daily[:, 1:])
+            np.maximum(daily, 0, out=daily)
+            
+            # Calculate 7-day moving average from a running sum: each window is the
+            # running total minus the total from 7 days earlier, so every day costs
+            # one subtraction instead of re-adding the whole window. Dividing by the
+            # number of real days in each window matches min_periods=1
+            self.log.debug("Calculating 7-day moving average")
+            window = 7
+            window_sums = np.cumsum(daily, axis=1, dtype=np.int64)
+            # NumPy buffers overlapping operands, so this in-place update is safe
+            window_sums[:, window:] -= window_sums[:, :-window]
+            seven_day_average = np.divide(window_sums, np.minimum(np.arange(1, n_dates + 1), window), dtype=np.float32)
             
-            # Ensure country_data is not empty
-            if self.country_data.empty:
-                self.log_debug("Warning: country_data is empty")
+            # Store processed data
+            self.set_series(countries, dates, summed, daily, seven_day_average)
+            self.log.debug("Final data: %s countries x %s dates", n_countries, n_dates)
             
-            return self.country_data
+            # Ensure the processed data is not empty
+            if n_countries == 0 or n_dates == 0:
+                self.log.warning("Processed data is empty")
             
         except Exception as e:
-            error_info = traceback.format_exc()
-            self.log_debug(f"Error in process_data: {str(e)}\n{error_info}")
+            self.log.exception("Error in process_data: %s", e)
             raise
             
+    def set_series(self, countries, dates, confirmed, daily_new, seven_day_average):
+        """Store the processed (countries x dates) matrices and index the countries"""
+        self.countries = countries
+        self.country_index = {country: row for row, country in enumerate(countries)}
+        self.dates = dates
+        self.confirmed = confirmed
+        self.daily_new = daily_new
+        self.seven_day_average = seven_day_average
+        
+    def to_frame(self):
+        """Return the processed data as a long frame sorted by country and date"""
+        # Row-major ravel order matches repeating each country once per date.
+        # Countries are stored as a categorical so each name is kept only once
+        n_countries, n_dates = self.confirmed.shape
+        return pd.DataFrame({
+            'Country/Region': pd.Categorical.from_codes(
+                np.repeat(np.arange(n_countries), n_dates),
+                categories=self.countries
+            ),
+            'Date': np.tile(self.dates.to_numpy(), n_countries),
+            'Confirmed': self.confirmed.ravel(),
+            'Daily_New': self.daily_new.ravel(),
+            'Seven_Day_Average': self.seven_day_average.ravel()
+        })
+        
+    def set_series_from_frame(self, frame):
+        """Restore the processed matrices from a frame created by to_frame"""
+        # On a categorical column this only compares the integer codes
+        countries = np.asarray(pd.unique(frame['Country/Region']), dtype=object)
+        n_countries = len(countries)
+        n_dates = len(frame) // n_countries if n_countries else 0
+        if n_countries * n_dates != len(frame):
+            raise ValueError("Cached data does not have one row per country and date")
+            
+        # Every country covers the same dates, so each column reshapes into a matrix
+        self.set_series(
+            countries,
+            pd.DatetimeIndex(frame['Date'].to_numpy()[:n_dates]),
+            frame['Confirmed'].to_numpy().reshape(n_countries, n_dates),
+            frame['Daily_New'].to_numpy().reshape(n_countries, n_dates),
+            frame['Seven_Day_Average'].to_numpy().reshape(n_countries, n_dates)
+        )
+        
     def get_country_list(self):
         """Return sorted list of countries"""
         try:
-            if self.data is None:
-                self.log_debug("Data not loaded for get_country_list")
+            if self.countries is None:
+                self.log.debug("Data not loaded for get_country_list")
                 return []
                 
-            countries = sorted(self.data['Country/Region'].unique())
-            self.log_debug(f"Found {len(countries)} countries")
+            countries = list(self.countries)
+            self.log.debug("Found %s countries", len(countries))
             return countries
             
         except Exception as e:
-            self.log_debug(f"Error in get_country_list: {str(e)}")
+            self.log.error("Error in get_country_list: %s", e)
             return []
             
+    def get_date_range(self):
+        """Return the first and last date in the processed data"""
+        if self.dates is None or len(self.dates) == 0:
+            self.log.debug("Data not loaded for get_date_range")
+            raise ValueError("No data loaded. Please load data first.")
+            
+        return self.dates[0], self.dates[-1]
+            
     def filter_data(self, country, start_date, end_date):
         """Filter data by country and date range"""
         try:
-            self.log_debug(f"Filter request - Country: {country}, Start: {start_date}, End: {end_date}")
+            self.log.debug("Filter request - Country: %s, Start: %s, End: %s", country, start_date, end_date)
             
             # Ensure we have processed data
-            if self.country_data is None:
-                self.log_debug("country_data is None in filter_data")
-                self.log_debug("Attempting to process data")
+            if self.confirmed is None:
+                self.log.debug("Processed data is None in filter_data")
+                self.log.debug("Attempting to process data")
                 
                 if self.data is not None:
                     self.process_data()
                 else:
-                    self.log_debug("No data loaded to process")
+                    self.log.debug("No data loaded to process")
                     raise ValueError("No data loaded. Please load data first.")
                     
-                if self.country_data is None:
-                    self.log_debug("country_data still None after processing")
-                    raise ValueError("Data processing failed. country_data is still None.")
-            
-            # Make a copy to avoid SettingWithCopyWarning
-            filtered_data = self.country_data.copy()
-            
-            # Debug country_data state
-            self.log_debug(f"country_data shape: {self.country_data.shape}")
-            self.log_debug(f"country_data columns: {list(self.country_data.columns)}")
-            
-            # Verify the Date column exists
-            if 'Date' not in filtered_data.columns:
-                self.log_debug(f"Date column missing in filter_data! Available columns: {list(filtered_data.columns)}")
-                raise ValueError("Date column is missing from the processed data.")
-            
-            # Filter by country
-            filtered_data = filtered_data[filtered_data['Country/Region'] == country]
-            self.log_debug(f"After country filter, shape: {filtered_data.shape}")
-            
-            # Check if filtered data is empty
-            if filtered_data.empty:
-                self.log_debug(f"No data found for country: {country}")
-                return filtered_data
-            
-            # Filter by date range
-            filtered_data = filtered_data[
-                (filtered_data['Date'] >= pd.to_datetime(start_date)) & 
-                (filtered_data['Date'] <= pd.to_datetime(end_date))
-            ]
-            
-            self.log_debug(f"After date filter, shape: {filtered_data.shape}")
-            
-            # Confirm Date column still exists
-            if 'Date' not in filtered_data.columns:
-                self.log_debug("Date column lost after filtering!")
+                if self.confirmed is None:
+                    self.log.debug("Processed data still None after processing")
+                    raise ValueError("Data processing failed. Processed data is still None.")
+            
+            # Look up the country's row
+            row = self.country_index.get(country)
+            if row is None:
+                self.log.debug("No data found for country: %s", country)
+                return pd.DataFrame(columns=['Country/Region', 'Date', 'Confirmed', 'Daily_New', 'Seven_Day_Average'])
+            
+            # The date index is sorted, so the inclusive range resolves by binary
+            # search, the same way .loc[start_date:end_date] would
+            span = self.dates.slice_indexer(pd.to_datetime(start_date), pd.to_datetime(end_date))
+            
+            filtered_data = pd.DataFrame({
+                'Country/Region': country,
+                'Date': self.dates[span],
+                'Confirmed': self.confirmed[row, span],
+                'Daily_New': self.daily_new[row, span],
+                'Seven_Day_Average': self.seven_day_average[row, span]
+            })
+            self.log.debug("After filter, shape: %s", filtered_data.shape)
             
             return filtered_data
             
         except Exception as e:
-            error_info = traceback.format_exc()
-            self.log_debug(f"Error in filter_data: {str(e)}\n{error_info}")
-            raise e
\ No newline at end of file
+            self.log.exception("Error in filter_data: %s", e)
+            raise e
+
+
+if __name__ == "__main__":
+    # Populate the on-disk cache ahead of time (e.g. while building a container)
+    # so the first dashboard session does not pay for the download and processing
+    logging.basicConfig(level=logging.DEBUG)
+    CovidDataProcessor().load_data()
@@ -15,9 +15,36 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize session state
-if 'data_processor' not in st.session_state:
-    st.session_state.data_processor = CovidDataProcessor()
+@st.cache_resource(ttl=3600, show_spinner=False)
+def get_data_processor():
+    """Load and process the data once per hour, shared across sessions"""
+    data_processor = CovidDataProcessor()
+    data_processor.load_data()
+    return data_processor
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_countries_and_date_range(_data_processor, data_version):
+    """Return the country list and date range for one version of the data"""
+    min_date, max_date = _data_processor.get_date_range()
+    return _data_processor.get_country_list(), min_date, max_date
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_filtered_data(_data_processor, data_version, country, start_date, end_date):
+    """Filter the data once per data version, country and date range"""
+    return _data_processor.filter_data(
+        country,
+        pd.to_datetime(start_date),
+        pd.to_datetime(end_date)
+    )
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def get_charts(_filtered_data, data_version, country, start_date, end_date):
+    """Build the charts once per data version, country and date range"""
+    return (
+        create_total_cases_chart(_filtered_data, country),
+        create_daily_cases_chart(_filtered_data, country),
+        create_growth_rate_chart(_filtered_data, country)
+    )
 
 # Header
 st.title("🦠 COVID-19 Analytics Dashboard")
@@ -28,39 +55,24 @@ This dashboard provides interactive visualizations of COVID-19 data worldwide.
 # Load data
 try:
     with st.spinner('Loading data...'):
-            data = st.session_state.data_processor.load_data()
-
-    # Ensure the data has been processed and Date column exists
-    if 'Date' not in data.columns:
-        st.session_state.data_processor.log_debug(f"No date for you")
-        raise ValueError("Datesss column is missing from the data.")
+            st.session_state.data_processor = get_data_processor()
+            data_version = st.session_state.data_processor.data_version
+            countries, min_date, max_date = get_countries_and_date_range(
+                st.session_state.data_processor,
+                data_version
+            )
 
     # Sidebar filters
     st.sidebar.header("📊 Filters")
     
     # Country selection
-    countries = st.session_state.data_processor.get_country_list()
     selected_country = st.sidebar.selectbox(
         "Select Country",
         countries,
         index=countries.index('India') if 'India' in countries else 0
     )
-    st.session_state.data_processor.log_debug(f"Selected country: {selected_country}")
-
-    # Ensure that 'Date' exists and calculate min_date and max_date
-    try:
-        if 'Date' not in data.columns:
-            st.error(f"Date column missing after country selection. Available columns: {list(data.columns)}")
-            st.stop()
-            
-        min_date = data['Date'].min()
-        max_date = data['Date'].max()
-        st.session_state.data_processor.log_debug(f"Date range: {min_date} to {max_date}")
-    
-    except Exception as e:
-        st.error(f"Error accessing date range: {str(e)}")
-        st.session_state.data_processor.log_debug(f"Error in date range: {str(e)}")
-        st.stop()
+    st.session_state.data_processor.log.debug("Selected country: %s", selected_country)
+    st.session_state.data_processor.log.debug("Date range: %s to %s", min_date, max_date)
 
     # Date range selection
     date_range = st.sidebar.date_input(
@@ -69,16 +81,17 @@ try:
         min_value=min_date,
         max_value=max_date
     )
-    st.session_state.data_processor.log_debug(f"Attemsps")
     if len(date_range) == 2:
         start_date, end_date = date_range
         
         # Attempt to filter data for the selected country and date range
-        st.session_state.data_processor.log_debug(f"Attempting to filter data for {selected_country}")
-        filtered_data = st.session_state.data_processor.filter_data(
+        st.session_state.data_processor.log.debug("Attempting to filter data for %s", selected_country)
+        filtered_data = get_filtered_data(
+            st.session_state.data_processor,
+            data_version,
             selected_country,
-            pd.to_datetime(start_date),
-            pd.to_datetime(end_date)
+            start_date,
+            end_date
         )
         
         if filtered_data.empty:
@@ -121,25 +134,32 @@ try:
             
             # Charts
             st.header("📊 Visualizations")
+            total_cases_chart, daily_cases_chart, growth_rate_chart = get_charts(
+                filtered_data,
+                data_version,
+                selected_country,
+                start_date,
+                end_date
+            )
             
             # Total cases chart
             st.subheader("Total Cases Over Time")
             st.plotly_chart(
-                create_total_cases_chart(filtered_data, selected_country),
+                total_cases_chart,
                 use_container_width=True
             )
             
             # Daily cases chart
             st.subheader("Daily New Cases")
             st.plotly_chart(
-                create_daily_cases_chart(filtered_data, selected_country),
+                daily_cases_chart,
                 use_container_width=True
             )
             
             # Growth rate chart
             st.subheader("Daily Growth Rate")
             st.plotly_chart(
-                create_growth_rate_chart(filtered_data, selected_country),
+                growth_rate_chart,
                 use_container_width=True
             )
         
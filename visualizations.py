@@ -1,16 +1,19 @@
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 def create_total_cases_chart(data, country):
     """Create line chart for total cases"""
-    fig = px.line(
-        data,
-        x='Date',
-        y='Confirmed',
-        title=f'Total COVID-19 Cases in {country}',
+    fig = go.Figure(
+        go.Scattergl(
+            x=data['Date'].to_numpy(),
+            y=data['Confirmed'].to_numpy(),
+            name="Total Cases",
+            mode='lines'
+        )
     )
     fig.update_layout(
+        title=f'Total COVID-19 Cases in {country}',
         xaxis_title="Date",
         yaxis_title="Total Cases",
         hovermode='x unified'
@@ -54,15 +57,26 @@ def create_daily_cases_chart(data, country):
 
 def create_growth_rate_chart(data, country):
     """Create line chart for growth rate"""
-    growth_rate = data['Daily_New'].pct_change() * 100
+    daily_new = data['Daily_New'].to_numpy()
     
-    fig = px.line(
-        x=data['Date'],
-        y=growth_rate,
-        title=f'Daily Growth Rate in {country} (%)',
+    # Day-over-day change in percent. The first day and days following a day
+    # with no new cases have no defined growth rate and stay NaN
+    growth_rate = np.full(len(daily_new), np.nan, dtype=np.float32)
+    previous = daily_new[:-1]
+    np.divide(np.diff(daily_new), previous, out=growth_rate[1:], where=previous != 0)
+    growth_rate[1:] *= 100
+    
+    fig = go.Figure(
+        go.Scattergl(
+            x=data['Date'].to_numpy(),
+            y=growth_rate,
+            name="Growth Rate (%)",
+            mode='lines'
+        )
     )
     
     fig.update_layout(
+        title=f'Daily Growth Rate in {country} (%)',
         xaxis_title="Date",
         yaxis_title="Growth Rate (%)",
         hovermode='x unified'